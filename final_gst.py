@@ -5,10 +5,29 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import io
+import os
+import csv
+import hashlib
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="E-commerce Analytics Dashboard",
@@ -60,65 +79,316 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Low-cardinality group keys, stored as categoricals so groupby works on integer codes
+MEESHO_CATEGORY_COLUMNS = ['end_customer_state_new', 'hsn_code', 'gst_rate']
+AMAZON_CATEGORY_COLUMNS = ['Transaction Type', 'Ship To State', 'Hsn/sac']
+
+# Columns the analyses actually use; everything else in the reports is skipped at read time
+MEESHO_COLUMNS = ['order_date', 'end_customer_state_new', 'hsn_code', 'gst_rate',
+                  'total_invoice_value', 'tax_amount', 'total_taxable_sale_value', 'quantity']
+AMAZON_COLUMNS = ['Transaction Type', 'Order Date', 'Ship To State', 'Hsn/sac',
+                  'Invoice Amount', 'Total Tax Amount', 'Tax Exclusive Gross', 'Quantity',
+                  'Tcs Igst Amount', 'Tcs Cgst Amount', 'Tcs Sgst Amount', 'Tcs Utgst Amount']
+AMAZON_TCS_COLUMNS = ['Tcs Igst Amount', 'Tcs Cgst Amount', 'Tcs Sgst Amount', 'Tcs Utgst Amount']
+
+# Post-read cleanup applied to every Amazon chunk (see prepare_report)
+AMAZON_CLEANUP = {
+    'category_columns': AMAZON_CATEGORY_COLUMNS,
+    'quantity_column': 'Quantity',
+    'date_columns': ['Order Date'],
+    'month_from': 'Order Date',
+}
+
+# Date layouts seen in the exports, tried in order; Indian reports put the day first
+REPORT_DATE_FORMATS = ['ISO8601', '%d/%m/%Y', '%d-%m-%Y']
+
+# Cap on bars in the state charts (every state and UT fits); free-text extras only drop from the chart, not the tables
+TOP_STATES = 40
+
+def header_names(file):
+    """Raw header names of a CSV file or path, leaving open files rewound; None when the header can't be peeked"""
+    if isinstance(file, (str, os.PathLike)):
+        try:
+            with open(file, 'rb') as f:
+                header = f.readline()
+        except OSError:
+            # A URL or unreadable path; nothing to project, so every column is read
+            return None
+    elif hasattr(file, 'readline'):
+        header = file.readline()
+        file.seek(0)
+    else:
+        return None
+    if isinstance(header, bytes):
+        header = header.decode('utf-8-sig', errors='replace')
+    return next(csv.reader([header]), [])
+
+def select_columns(file, wanted):
+    """Raw header names whose stripped form is in wanted, or None to read every column"""
+    return [name for name in header_names(file) or [] if name.strip() in wanted] or None
+
+def read_csv_fast(file, columns=None):
+    """Read a CSV with Polars (or the PyArrow engine), falling back to the C engine"""
+    usecols = select_columns(file, columns) if columns is not None else None
+    if pl is not None:
+        try:
+            return pl.read_csv(file, columns=usecols).to_pandas(use_pyarrow_extension_array=True)
+        except (ImportError, pl.exceptions.PolarsError):
+            # Schema Polars can't infer; let pandas try
+            if hasattr(file, 'seek'):
+                file.seek(0)
+    try:
+        return pd.read_csv(file, engine="pyarrow", dtype_backend="pyarrow", usecols=usecols)
+    except (ImportError, TypeError, ValueError):
+        # pyarrow not installed, older pandas, or a file the pyarrow engine can't parse
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        return pd.read_csv(file, usecols=usecols)
+
+def amazon_csv_options(file, columns=AMAZON_COLUMNS):
+    """PyArrow read and convert options for an Amazon MTR report with a known schema"""
+    # Dictionary-encoded strings arrive in pandas ready to become categoricals
+    category = pa.dictionary(pa.int32(), pa.string())
+    column_types = {
+        'Order Date': pa.string(),
+        'Invoice Amount': pa.float64(),
+        'Total Tax Amount': pa.float64(),
+        'Tax Exclusive Gross': pa.float64(),
+        'Quantity': pa.int32(),
+        'Transaction Type': category,
+        'Ship To State': category,
+        'Hsn/sac': category,
+    }
+    column_types.update({col: pa.float64() for col in AMAZON_TCS_COLUMNS})
+    # Arrow matches raw header names, so key the types by the padded names actually in the file
+    include_columns = select_columns(file, columns) or []
+    # Every column is typed up front, so later blocks can't disagree with types inferred from the first;
+    # dates stay strings here and are parsed by prepare_report
+    convert_options = pacsv.ConvertOptions(
+        include_columns=include_columns,
+        column_types={name: column_types[name.strip()] for name in include_columns if name.strip() in column_types},
+        strings_can_be_null=True
+    )
+    read_options = pacsv.ReadOptions(block_size=8 * 1024 * 1024, use_threads=True)
+    return read_options, convert_options
+
+def arrow_to_pandas_type(arrow_type):
+    """Dictionary columns convert straight to pandas Categoricals; everything else stays Arrow-backed"""
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+def read_amazon_chunks(file, columns=AMAZON_COLUMNS):
+    """Yield an Amazon MTR report as PyArrow-streamed frames of one block each"""
+    read_options, convert_options = amazon_csv_options(file, columns)
+    for batch in pacsv.open_csv(file, read_options=read_options, convert_options=convert_options):
+        yield batch.to_pandas(types_mapper=arrow_to_pandas_type)
+
+def read_csv_chunks(file, columns=None, chunksize=100_000):
+    """Yield a CSV in bounded-size frames with the pandas C engine"""
+    yield from pd.read_csv(file, usecols=select_columns(file, columns) if columns is not None else None,
+                           chunksize=chunksize)
+
+def parse_report_dates(values):
+    """Parse report dates with the first explicit format that matches, inferring the format only if none do"""
+    for date_format in REPORT_DATE_FORMATS:
+        parsed = pd.to_datetime(values, format=date_format, errors='coerce', cache=True)
+        if parsed.notna().any() or values.isna().all():
+            return parsed
+    # None of the known layouts; let pandas infer the format instead
+    return pd.to_datetime(values, errors='coerce', cache=True)
+
+def to_categories(df, columns):
+    """Convert the given columns (when present) to categorical dtype in place"""
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+def prepare_report(df, category_columns=(), quantity_column=None, date_columns=(), month_from=None):
+    """Shared post-read cleanup: stripped names, categorical keys, narrow quantities and parsed dates"""
+    df.columns = df.columns.str.strip()
+    to_categories(df, category_columns)
+    
+    # Quantities fit in a byte or two; narrow them to cut groupby memory traffic
+    if quantity_column in df.columns:
+        df[quantity_column] = pd.to_numeric(df[quantity_column], downcast='unsigned')
+    
+    # Convert date columns (also normalises Arrow timestamps to numpy datetimes)
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = parse_report_dates(df[col])
+    
+    # Truncate to month with a vectorized datetime64 cast instead of building Periods
+    if month_from in df.columns:
+        dates = df[month_from]
+        # Keep local wall time for offset-aware dates; the numpy cast would shift them to UTC first
+        if isinstance(dates.dtype, pd.DatetimeTZDtype):
+            dates = dates.dt.tz_localize(None)
+        df['month'] = dates.to_numpy().astype('datetime64[M]')
+    return df
+
+def group_sums(df, key, value_cols):
+    """Sum value_cols per key without sorting groups or expanding unused categories"""
+    return df.groupby(key, sort=False, observed=True)[value_cols].sum()
+
+def platform_totals(df, cols):
+    """Column totals in a single vectorized reduction, for when no grouping is needed"""
+    return df[cols].sum()
+
+def summarize_amazon_chunks(chunks):
+    """Build the Amazon analysis from prepared chunks by accumulating per-chunk sums"""
+    value_cols = ['Invoice Amount', 'Total Tax Amount', 'Quantity']
+    total_cols = ['Invoice Amount', 'Total Tax Amount', 'Tax Exclusive Gross'] + AMAZON_TCS_COLUMNS
+    type_counts = pd.Series(dtype='float64')
+    totals = pd.Series(dtype='float64')
+    grouped = {}
+    
+    for chunk in chunks:
+        # Count every transaction type in one pass; only shipments need materializing
+        type_counts = type_counts.add(chunk['Transaction Type'].value_counts(), fill_value=0)
+        shipments = chunk[chunk['Transaction Type'] == 'Shipment']
+        
+        # Grand totals and per-key sums are associative, so partial results just add up
+        totals = totals.add(platform_totals(shipments, [col for col in total_cols if col in shipments.columns]), fill_value=0)
+        for key in ['Ship To State', 'month', 'Hsn/sac']:
+            if key in shipments.columns:
+                partial = group_sums(shipments[[key] + value_cols], key, value_cols)
+                grouped[key] = grouped[key].add(partial, fill_value=0) if key in grouped else partial
+    
+    analysis = {}
+    
+    # Basic metrics
+    analysis['total_shipments'] = int(type_counts.get('Shipment', 0))
+    analysis['total_refunds'] = int(type_counts.get('Refund', 0))
+    analysis['total_cancellations'] = int(type_counts.get('Cancel', 0))
+    
+    if analysis['total_shipments'] > 0:
+        analysis['total_sales'] = totals['Invoice Amount']
+        analysis['total_tax'] = totals['Total Tax Amount']
+        analysis['tax_exclusive_gross'] = totals['Tax Exclusive Gross']
+        
+        # Adding partials with fill_value widens quantities to float; restore integer counts
+        grouped = {key: frame.astype({'Quantity': 'int64'}) for key, frame in grouped.items()}
+        
+        # State-wise analysis
+        analysis['state_wise'] = grouped['Ship To State']
+        
+        # Monthly analysis
+        if 'month' in grouped:
+            analysis['monthly'] = grouped['month']
+        
+        # Product analysis
+        analysis['product_performance'] = grouped['Hsn/sac']
+        
+        # TCS analysis
+        analysis['total_tcs'] = totals.reindex(AMAZON_TCS_COLUMNS, fill_value=0).sum()
+    
+    return analysis
+
+if njit is not None:
+    @njit(cache=True)
+    def _fused_group_sums_kernel(codes, offsets, vals, n_buckets):
+        """Accumulate every row into its bucket for each key in a single pass"""
+        acc = np.zeros((n_buckets, vals.shape[1]))
+        counts = np.zeros(n_buckets, dtype=np.int64)
+        for i in range(vals.shape[0]):
+            for k in range(codes.shape[0]):
+                code = codes[k, i]
+                if code < 0:
+                    continue
+                bucket = offsets[k] + code
+                counts[bucket] += 1
+                for j in range(vals.shape[1]):
+                    if not np.isnan(vals[i, j]):
+                        acc[bucket, j] += vals[i, j]
+        return acc, counts
+
+def bincount_group_sums(codes, vals, n_groups):
+    """Per-code column sums and row counts via np.bincount"""
+    valid = codes >= 0
+    codes, vals = codes[valid], vals[valid]
+    sums = np.column_stack([np.bincount(codes, weights=vals[:, j], minlength=n_groups)
+                            for j in range(vals.shape[1])]).reshape(n_groups, vals.shape[1])
+    return sums, np.bincount(codes, minlength=n_groups)
+
+def fused_group_sums(df, keys, value_cols):
+    """Sum value_cols per key for several categorical keys, in one Numba pass when available"""
+    categoricals = [df[key].astype('category') for key in keys]
+    sizes = np.array([len(col.cat.categories) for col in categoricals], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    codes = np.vstack([col.cat.codes.to_numpy(dtype=np.int64) for col in categoricals])
+    vals = df[value_cols].to_numpy(dtype='float64', na_value=np.nan)
+    if njit is not None:
+        acc, counts = _fused_group_sums_kernel(codes, offsets, vals, int(sizes.sum()))
+    else:
+        # Without Numba, bin each key's codes directly; still no hashing of key values
+        filled = np.nan_to_num(vals)
+        parts = [bincount_group_sums(key_codes, filled, size) for key_codes, size in zip(codes, sizes)]
+        acc = np.vstack([part[0] for part in parts])
+        counts = np.concatenate([part[1] for part in parts])
+    
+    results = {}
+    for key, col, offset, size in zip(keys, categoricals, offsets, sizes):
+        observed = counts[offset:offset + size] > 0
+        result = pd.DataFrame(acc[offset:offset + size][observed],
+                              index=pd.Index(col.cat.categories[observed], name=key),
+                              columns=value_cols)
+        # Integer sums come back as int64, like pandas' widened groupby sums
+        results[key] = result.astype({col: 'int64' for col in value_cols if pd.api.types.is_integer_dtype(df[col])})
+    return results
+
 class EcommerceAnalyzer:
     def __init__(self):
         self.meesho_sales = None
         self.meesho_returns = None
         self.flipkart_data = None
-        self.amazon_data = None
         
-    def load_meesho_data(self, sales_file, returns_file=None):
-        """Load and process Meesho sales and returns data"""
+    def _load_report(self, platform, file, reader=read_csv_fast, columns=None, summarize=None,
+                     fallback_reader=None, **cleanup):
+        """Read and clean one report, reporting any failure in the UI; returns None on error
+        
+        With summarize, reader yields chunks: each is cleaned as it arrives and folded into the summary.
+        If reader rejects the file's contents, the whole read restarts with fallback_reader.
+        """
+        def read(read_with):
+            if summarize is not None:
+                return summarize(prepare_report(chunk, **cleanup) for chunk in read_with(file, columns=columns))
+            return prepare_report(read_with(file, columns=columns), **cleanup)
+        
         try:
-            # Load sales data
-            self.meesho_sales = pd.read_csv(sales_file)
-            
-            # Clean column names
-            self.meesho_sales.columns = self.meesho_sales.columns.str.strip()
-            
-            # Convert date columns
-            if 'order_date' in self.meesho_sales.columns:
-                self.meesho_sales['order_date'] = pd.to_datetime(self.meesho_sales['order_date'], errors='coerce')
-            
-            # Process returns data if provided
-            if returns_file is not None:
-                try:
-                    self.meesho_returns = pd.read_csv(returns_file)
-                    self.meesho_returns.columns = self.meesho_returns.columns.str.strip()
-                except:
-                    st.warning("Could not process returns file. It might be in a different format.")
-                    
-            return True
+            try:
+                return read(reader)
+            except ValueError:
+                if fallback_reader is None:
+                    raise
+                # Includes pyarrow.ArrowInvalid; partial sums are discarded along with the failed read
+                if hasattr(file, 'seek'):
+                    file.seek(0)
+                return read(fallback_reader)
         except Exception as e:
-            st.error(f"Error loading Meesho data: {str(e)}")
+            st.error(f"Error loading {platform} data: {str(e)}")
+            return None
+    
+    def load_meesho_data(self, sales_file, returns_file=None):
+        """Load and process Meesho sales and returns data"""
+        self.meesho_sales = self._load_report('Meesho', sales_file, columns=MEESHO_COLUMNS,
+                                              category_columns=MEESHO_CATEGORY_COLUMNS,
+                                              quantity_column='quantity',
+                                              date_columns=['order_date'], month_from='order_date')
+        if self.meesho_sales is None:
             return False
+        
+        # Process returns data if provided
+        if returns_file is not None:
+            try:
+                self.meesho_returns = prepare_report(read_csv_fast(returns_file))
+            except:
+                st.warning("Could not process returns file. It might be in a different format.")
+                
+        return True
     
     def load_flipkart_data(self, file):
         """Load and process Flipkart data"""
-        try:
-            self.flipkart_data = pd.read_csv(file)
-            self.flipkart_data.columns = self.flipkart_data.columns.str.strip()
-            return True
-        except Exception as e:
-            st.error(f"Error loading Flipkart data: {str(e)}")
-            return False
-    
-    def load_amazon_data(self, file):
-        """Load and process Amazon data"""
-        try:
-            self.amazon_data = pd.read_csv(file)
-            self.amazon_data.columns = self.amazon_data.columns.str.strip()
-            
-            # Convert date columns
-            date_columns = ['Invoice Date', 'Order Date', 'Shipment Date']
-            for col in date_columns:
-                if col in self.amazon_data.columns:
-                    self.amazon_data[col] = pd.to_datetime(self.amazon_data[col], errors='coerce')
-                    
-            return True
-        except Exception as e:
-            st.error(f"Error loading Amazon data: {str(e)}")
-            return False
+        self.flipkart_data = self._load_report('Flipkart', file)
+        return self.flipkart_data is not None
     
     def analyze_meesho_data(self):
         """Analyze Meesho sales data"""
@@ -133,99 +403,44 @@ class EcommerceAnalyzer:
         analysis['total_tax'] = self.meesho_sales['tax_amount'].sum()
         analysis['taxable_sales'] = self.meesho_sales['total_taxable_sale_value'].sum()
         
+        # One column subset shared by every grouping below
+        value_cols = ['total_invoice_value', 'tax_amount', 'quantity']
+        key_cols = [col for col in ['end_customer_state_new', 'month', 'hsn_code', 'gst_rate'] if col in self.meesho_sales.columns]
+        df_sub = self.meesho_sales[key_cols + value_cols]
+        
+        # All groupings computed together
+        grouped = fused_group_sums(df_sub, key_cols, value_cols)
+        
         # State-wise analysis
-        analysis['state_wise'] = self.meesho_sales.groupby('end_customer_state_new').agg({
-            'total_invoice_value': 'sum',
-            'tax_amount': 'sum',
-            'quantity': 'sum'
-        }).round(2)
+        analysis['state_wise'] = grouped['end_customer_state_new']
         
         # Monthly analysis
-        if 'order_date' in self.meesho_sales.columns:
-            self.meesho_sales['month'] = self.meesho_sales['order_date'].dt.to_period('M')
-            analysis['monthly'] = self.meesho_sales.groupby('month').agg({
-                'total_invoice_value': 'sum',
-                'tax_amount': 'sum',
-                'quantity': 'sum'
-            }).round(2)
+        if 'month' in grouped:
+            analysis['monthly'] = grouped['month']
         
         # Product analysis
-        analysis['product_performance'] = self.meesho_sales.groupby('hsn_code').agg({
-            'total_invoice_value': 'sum',
-            'tax_amount': 'sum',
-            'quantity': 'sum'
-        }).round(2)
+        analysis['product_performance'] = grouped['hsn_code']
         
         # Tax rate analysis
-        analysis['tax_rate_analysis'] = self.meesho_sales.groupby('gst_rate').agg({
-            'total_invoice_value': 'sum',
-            'tax_amount': 'sum',
-            'quantity': 'sum'
-        }).round(2)
+        analysis['tax_rate_analysis'] = grouped['gst_rate']
         
         return analysis
     
-    def analyze_amazon_data(self):
-        """Analyze Amazon sales data"""
-        if self.amazon_data is None:
-            return None
-            
-        analysis = {}
-        
-        # Filter for actual transactions (not cancellations)
-        shipments = self.amazon_data[self.amazon_data['Transaction Type'] == 'Shipment']
-        refunds = self.amazon_data[self.amazon_data['Transaction Type'] == 'Refund']
-        cancellations = self.amazon_data[self.amazon_data['Transaction Type'] == 'Cancel']
-        
-        # Basic metrics
-        analysis['total_shipments'] = len(shipments)
-        analysis['total_refunds'] = len(refunds)
-        analysis['total_cancellations'] = len(cancellations)
-        
-        if not shipments.empty:
-            analysis['total_sales'] = shipments['Invoice Amount'].sum()
-            analysis['total_tax'] = shipments['Total Tax Amount'].sum()
-            analysis['tax_exclusive_gross'] = shipments['Tax Exclusive Gross'].sum()
-            
-            # State-wise analysis
-            analysis['state_wise'] = shipments.groupby('Ship To State').agg({
-                'Invoice Amount': 'sum',
-                'Total Tax Amount': 'sum',
-                'Quantity': 'sum'
-            }).round(2)
-            
-            # Monthly analysis
-            if 'Order Date' in shipments.columns:
-                shipments['month'] = shipments['Order Date'].dt.to_period('M')
-                analysis['monthly'] = shipments.groupby('month').agg({
-                    'Invoice Amount': 'sum',
-                    'Total Tax Amount': 'sum',
-                    'Quantity': 'sum'
-                }).round(2)
-            
-            # Product analysis
-            analysis['product_performance'] = shipments.groupby('Hsn/sac').agg({
-                'Invoice Amount': 'sum',
-                'Total Tax Amount': 'sum',
-                'Quantity': 'sum'
-            }).round(2)
-            
-            # TCS analysis
-            tcs_columns = ['Tcs Igst Amount', 'Tcs Cgst Amount', 'Tcs Sgst Amount', 'Tcs Utgst Amount']
-            tcs_data = []
-            for col in tcs_columns:
-                if col in shipments.columns:
-                    tcs_data.append(shipments[col].sum())
-            analysis['total_tcs'] = sum(tcs_data)
-        
-        return analysis
+    def stream_amazon_data(self, file):
+        """Analyze Amazon data chunk by chunk, without holding the whole report in memory"""
+        if pa is None:
+            return self._load_report('Amazon', file, reader=read_csv_chunks, columns=AMAZON_COLUMNS,
+                                     summarize=summarize_amazon_chunks, **AMAZON_CLEANUP)
+        # Arrow streams faster, but a value that breaks the declared schema sends the report back through pandas
+        return self._load_report('Amazon', file, reader=read_amazon_chunks, columns=AMAZON_COLUMNS,
+                                 summarize=summarize_amazon_chunks, fallback_reader=read_csv_chunks,
+                                 **AMAZON_CLEANUP)
     
-    def create_comparison_dashboard(self):
-        """Create comparison dashboard across platforms"""
+    def create_comparison_dashboard(self, meesho_analysis=None, amazon_analysis=None):
+        """Create comparison dashboard across platforms from precomputed analyses"""
         comparisons = {}
         
         # Meesho analysis
-        meesho_analysis = self.analyze_meesho_data()
         if meesho_analysis:
             comparisons['Meesho'] = {
                 'Sales': meesho_analysis['total_sales'],
@@ -234,7 +449,6 @@ class EcommerceAnalyzer:
             }
         
         # Amazon analysis
-        amazon_analysis = self.analyze_amazon_data()
         if amazon_analysis:
             comparisons['Amazon'] = {
                 'Sales': amazon_analysis.get('total_sales', 0),
@@ -252,6 +466,32 @@ class EcommerceAnalyzer:
         
         return comparisons
 
+@st.cache_data(show_spinner=False)
+def cached_meesho_analysis(raw_bytes):
+    """Load and analyze Meesho data, memoized on the uploaded file contents"""
+    analyzer = EcommerceAnalyzer()
+    if not analyzer.load_meesho_data(io.BytesIO(raw_bytes)):
+        return None
+    return analyzer.analyze_meesho_data()
+
+@st.cache_data(show_spinner=False)
+def cached_amazon_analysis(raw_bytes):
+    """Stream and analyze Amazon data, memoized on the uploaded file contents"""
+    return EcommerceAnalyzer().stream_amazon_data(io.BytesIO(raw_bytes))
+
+def frame_key(df):
+    """Content hash of a DataFrame (values, index and column names) for use as a cache key"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df).to_numpy().tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    return digest.hexdigest()
+
+@st.cache_resource(show_spinner=False, max_entries=64, ttl=3600)
+def cached_figure(chart, data_key, _data, index_arg=None, **kwargs):
+    """Build a Plotly Express figure once per chart type, data hash and options"""
+    if index_arg is not None:
+        kwargs[index_arg] = _data.index
+    return getattr(px, chart)(_data, **kwargs)
+
 def main():
     st.markdown('<h1 class="main-header">🛒 Multi-Platform E-commerce Analytics Dashboard</h1>', unsafe_allow_html=True)
     
@@ -275,13 +515,18 @@ def main():
     
     # Load data
     data_loaded = False
+    meesho_analysis = None
+    amazon_analysis = None
     
     if meesho_sales_file:
-        if analyzer.load_meesho_data(meesho_sales_file, meesho_returns_file):
+        # The analysis only reads sales; returns stay out of the cache key so uploading them doesn't re-run it
+        meesho_analysis = cached_meesho_analysis(meesho_sales_file.getvalue())
+        if meesho_analysis is not None:
             data_loaded = True
     
     if amazon_file:
-        if analyzer.load_amazon_data(amazon_file):
+        amazon_analysis = cached_amazon_analysis(amazon_file.getvalue())
+        if amazon_analysis is not None:
             data_loaded = True
     
     if flipkart_file:
@@ -295,21 +540,20 @@ def main():
     # Create tabs for different analyses
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "🛍️ Meesho Analysis", "📦 Amazon Analysis", "🏪 Flipkart Analysis", "📈 Comparison"])
     
+    # Platform comparison, shared by the Overview and Comparison tabs
+    comparisons = analyzer.create_comparison_dashboard(meesho_analysis, amazon_analysis)
+    df_comparison = pd.DataFrame(comparisons).T.fillna(0)
+    
     with tab1:
         st.header("📊 Platform Overview")
         
-        # Platform comparison
-        comparisons = analyzer.create_comparison_dashboard()
-        
         if comparisons:
             col1, col2, col3 = st.columns(3)
             
             with col1:
                 st.metric("Total Platforms", len(comparisons))
             
-            total_sales = sum([comp.get('Sales', 0) for comp in comparisons.values()])
-            total_tax = sum([comp.get('Tax', 0) for comp in comparisons.values()])
-            total_orders = sum([comp.get('Orders', 0) for comp in comparisons.values()])
+            total_sales, total_tax, total_orders = df_comparison[['Sales', 'Tax', 'Orders']].sum()
             
             with col2:
                 st.metric("Total Sales", f"₹{total_sales:,.2f}")
@@ -319,19 +563,14 @@ def main():
             
             # Platform-wise metrics
             if len(comparisons) > 1:
-                df_comparison = pd.DataFrame(comparisons).T
-                df_comparison = df_comparison.fillna(0)
-                
-                fig = px.bar(df_comparison, 
-                           title="Platform-wise Sales Comparison",
-                           labels={'value': 'Amount (₹)', 'index': 'Platform'})
+                fig = cached_figure('bar', frame_key(df_comparison), df_comparison,
+                                    title="Platform-wise Sales Comparison",
+                                    labels={'value': 'Amount (₹)', 'index': 'Platform'})
                 st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
         st.header("🛍️ Meesho Analysis")
         
-        meesho_analysis = analyzer.analyze_meesho_data()
-        
         if meesho_analysis:
             # Key metrics
             col1, col2, col3, col4 = st.columns(4)
@@ -352,22 +591,23 @@ def main():
             # State-wise analysis
             st.subheader("State-wise Performance")
             state_data = meesho_analysis['state_wise'].sort_values('total_invoice_value', ascending=False)
+            top_states = state_data.head(TOP_STATES)
             
-            fig = px.bar(state_data, 
-                        x=state_data.index, 
-                        y='total_invoice_value',
-                        title="State-wise Sales Distribution",
-                        labels={'total_invoice_value': 'Sales (₹)', 'index': 'State'})
+            fig = cached_figure('bar', frame_key(top_states), top_states,
+                                index_arg='x',
+                                y='total_invoice_value',
+                                title="State-wise Sales Distribution",
+                                labels={'total_invoice_value': 'Sales (₹)', 'index': 'State'})
             st.plotly_chart(fig, use_container_width=True)
             
             # Tax rate analysis
             st.subheader("Tax Rate Analysis")
             tax_rate_data = meesho_analysis['tax_rate_analysis']
             
-            fig = px.pie(tax_rate_data, 
-                        values='total_invoice_value', 
-                        names=tax_rate_data.index,
-                        title="Sales Distribution by Tax Rate")
+            fig = cached_figure('pie', frame_key(tax_rate_data), tax_rate_data,
+                                index_arg='names',
+                                values='total_invoice_value',
+                                title="Sales Distribution by Tax Rate")
             st.plotly_chart(fig, use_container_width=True)
             
             # Detailed tables
@@ -376,13 +616,13 @@ def main():
             tab_states, tab_products, tab_tax = st.tabs(["States", "Products", "Tax Rates"])
             
             with tab_states:
-                st.dataframe(state_data)
+                st.dataframe(state_data.style.format(precision=2))
             
             with tab_products:
-                st.dataframe(meesho_analysis['product_performance'])
+                st.dataframe(meesho_analysis['product_performance'].style.format(precision=2))
             
             with tab_tax:
-                st.dataframe(tax_rate_data)
+                st.dataframe(tax_rate_data.style.format(precision=2))
         
         else:
             st.info("No Meesho data available for analysis")
@@ -390,8 +630,6 @@ def main():
     with tab3:
         st.header("📦 Amazon Analysis")
         
-        amazon_analysis = analyzer.analyze_amazon_data()
-        
         if amazon_analysis:
             # Key metrics
             col1, col2, col3, col4 = st.columns(4)
@@ -426,15 +664,16 @@ def main():
             if 'state_wise' in amazon_analysis:
                 st.subheader("State-wise Performance")
                 state_data = amazon_analysis['state_wise'].sort_values('Invoice Amount', ascending=False)
+                top_states = state_data.head(TOP_STATES)
                 
-                fig = px.bar(state_data, 
-                            x=state_data.index, 
-                            y='Invoice Amount',
-                            title="State-wise Sales Distribution",
-                            labels={'Invoice Amount': 'Sales (₹)', 'index': 'State'})
+                fig = cached_figure('bar', frame_key(top_states), top_states,
+                                    index_arg='x',
+                                    y='Invoice Amount',
+                                    title="State-wise Sales Distribution",
+                                    labels={'Invoice Amount': 'Sales (₹)', 'index': 'State'})
                 st.plotly_chart(fig, use_container_width=True)
                 
-                st.dataframe(state_data)
+                st.dataframe(state_data.style.format(precision=2))
         
         else:
             st.info("No Amazon data available for analysis")
@@ -468,28 +707,24 @@ def main():
     with tab5:
         st.header("📈 Platform Comparison")
         
-        comparisons = analyzer.create_comparison_dashboard()
-        
         if len(comparisons) > 1:
-            df_comparison = pd.DataFrame(comparisons).T
-            df_comparison = df_comparison.fillna(0)
-            
             # Sales comparison
-            fig = px.bar(df_comparison, 
-                        y=df_comparison.index, 
-                        x='Sales',
-                        orientation='h',
-                        title="Sales Comparison Across Platforms",
-                        labels={'Sales': 'Sales (₹)', 'index': 'Platform'})
+            comparison_key = frame_key(df_comparison)
+            fig = cached_figure('bar', comparison_key, df_comparison,
+                                index_arg='y',
+                                x='Sales',
+                                orientation='h',
+                                title="Sales Comparison Across Platforms",
+                                labels={'Sales': 'Sales (₹)', 'index': 'Platform'})
             st.plotly_chart(fig, use_container_width=True)
             
             # Tax comparison
-            fig = px.bar(df_comparison, 
-                        y=df_comparison.index, 
-                        x='Tax',
-                        orientation='h',
-                        title="Tax Comparison Across Platforms",
-                        labels={'Tax': 'Tax (₹)', 'index': 'Platform'})
+            fig = cached_figure('bar', comparison_key, df_comparison,
+                                index_arg='y',
+                                x='Tax',
+                                orientation='h',
+                                title="Tax Comparison Across Platforms",
+                                labels={'Tax': 'Tax (₹)', 'index': 'Platform'})
             st.plotly_chart(fig, use_container_width=True)
             
             # Summary table